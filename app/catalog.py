@@ -0,0 +1,171 @@
+# api/app/catalog.py
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Callable
+
+from sqlalchemy import Engine, text
+
+from app.core.serialization import rows_as_dicts
+
+# Ranking: exact SKU, SKU prefix, name prefix, then trigram similarity.
+# Each branch of the OR is served by a (tenant_id, ...) index from migration
+# 8d1f2c7a4b90. pg_trgm extracts no trigrams from fewer than three characters,
+# so shorter queries only use the prefix branches.
+_SEARCH = """
+    select id, sku, name, category, unit,
+           case when lower(sku) = :lq then 3
+                when lower(sku) like :prefix then 2
+                when lower(name) like :prefix then 1
+                else 0 end as tier,
+           greatest(similarity(lower(sku), :lq), similarity(lower(name), :lq)) as score
+    from product
+    where tenant_id = cast(:t as uuid)
+      and (lower(sku) like :prefix
+           or lower(name) like :prefix{fuzzy})
+    order by tier desc, score desc, sku
+    limit :n offset :o
+"""
+SEARCH_SQL = text(_SEARCH.format(fuzzy=""))
+FUZZY_SEARCH_SQL = text(_SEARCH.format(fuzzy="""
+           or lower(name) like :contains
+           or lower(name) % :lq"""))
+FUZZY_MIN_LENGTH = 3
+
+LOAD_SQL = text("select id, sku, name from product where tenant_id = cast(:t as uuid)")
+
+
+def _like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_products(conn, tenant_id: str, q: str, limit: int, offset: int) -> list[dict]:
+    lq = q.lower()
+    esc = _like_escape(lq)
+    sql = FUZZY_SEARCH_SQL if len(lq) >= FUZZY_MIN_LENGTH else SEARCH_SQL
+    return rows_as_dicts(conn.execute(sql, {
+        "t": tenant_id, "lq": lq, "prefix": esc + "%", "contains": "%" + esc + "%",
+        "n": limit, "o": offset,
+    }))
+
+
+class _TenantSkus:
+    __slots__ = ("keys", "entries", "by_id", "loaded_at", "lock")
+
+    def __init__(self, result, loaded_at: float):
+        rows = sorted(((sku.lower(), str(pid), sku, name) for pid, sku, name in result), key=itemgetter(0))
+        self.keys = [r[0] for r in rows]
+        self.entries = [r[1:] for r in rows]
+        self.by_id = {r[1]: r[0] for r in rows}
+        self.loaded_at = loaded_at
+        self.lock = threading.Lock()
+
+
+class SkuPrefixIndex:
+    """Per-tenant sorted SKU list for autocomplete, loaded lazily from the DB.
+
+    Local product upserts are applied in place; changes made by other
+    processes show up after the tenant's copy passes `ttl` seconds and is
+    reloaded in the background. Concurrent first lookups for a tenant share
+    one load. Least recently used tenants are dropped beyond `max_tenants`
+    tenants or `max_entries` SKUs in total. Tenant ids may be UUIDs or UUID
+    strings in any case; they are keyed by their canonical form.
+    """
+
+    def __init__(self, engine_for: Callable[[str], Engine], ttl: float = 300.0, max_tenants: int = 64,
+                 max_entries: int = 2_000_000):
+        self.engine_for = engine_for
+        self.ttl = ttl
+        self.max_tenants = max_tenants
+        self.max_entries = max_entries
+        self._tenants: "OrderedDict[str, _TenantSkus]" = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(tenant_id) -> str:
+        return str(uuid.UUID(str(tenant_id)))
+
+    def _get(self, tenant_id: str) -> _TenantSkus:
+        with self._lock:
+            idx = self._tenants.get(tenant_id)
+            if idx is not None:
+                self._tenants.move_to_end(tenant_id)
+                stale = time.monotonic() - idx.loaded_at > self.ttl and tenant_id not in self._refreshing
+                if stale:
+                    self._refreshing.add(tenant_id)
+        if idx is None:
+            return self._load_once(tenant_id)
+        if stale:
+            # Large catalogs take seconds to load; keep serving the old copy meanwhile.
+            threading.Thread(target=self._load, args=(tenant_id,), daemon=True).start()
+        return idx
+
+    def _load_once(self, tenant_id: str) -> _TenantSkus:
+        with self._lock:
+            loading = self._loading.setdefault(tenant_id, threading.Lock())
+        with loading:
+            with self._lock:
+                idx = self._tenants.get(tenant_id)
+            try:
+                return idx if idx is not None else self._load(tenant_id)
+            finally:
+                with self._lock:
+                    if self._loading.get(tenant_id) is loading:
+                        del self._loading[tenant_id]
+
+    def _load(self, tenant_id: str) -> _TenantSkus:
+        try:
+            with self.engine_for(tenant_id).begin() as conn:
+                idx = _TenantSkus(conn.execute(LOAD_SQL, {"t": tenant_id}), time.monotonic())
+            with self._lock:
+                self._tenants[tenant_id] = idx
+                self._tenants.move_to_end(tenant_id)
+                while len(self._tenants) > 1 and (len(self._tenants) > self.max_tenants
+                                                  or self._entries() > self.max_entries):
+                    self._tenants.popitem(last=False)
+            return idx
+        finally:
+            with self._lock:
+                self._refreshing.discard(tenant_id)
+
+    def _entries(self) -> int:
+        return sum(len(idx.keys) for idx in self._tenants.values())
+
+    def complete(self, tenant_id: str, prefix: str, limit: int = 10) -> list[dict]:
+        idx = self._get(self._key(tenant_id))
+        key = prefix.lower()
+        out = []
+        with idx.lock:
+            i = bisect_left(idx.keys, key)
+            while i < len(idx.keys) and len(out) < limit and idx.keys[i].startswith(key):
+                pid, sku, name = idx.entries[i]
+                out.append({"id": pid, "sku": sku, "name": name})
+                i += 1
+        return out
+
+    def upsert(self, tenant_id: str, product_id: str, sku: str, name: str) -> None:
+        with self._lock:
+            idx = self._tenants.get(self._key(tenant_id))
+        if idx is None:
+            return  # not loaded yet; the first lookup reads it from the DB
+        product_id = str(product_id)
+        with idx.lock:
+            old = idx.by_id.get(product_id)
+            if old is not None:
+                i = bisect_left(idx.keys, old)
+                while i < len(idx.keys) and idx.keys[i] == old:
+                    if idx.entries[i][0] == product_id:
+                        del idx.keys[i]
+                        del idx.entries[i]
+                        break
+                    i += 1
+            key = sku.lower()
+            i = bisect_left(idx.keys, key)
+            idx.keys.insert(i, key)
+            idx.entries.insert(i, (product_id, sku, name))
+            idx.by_id[product_id] = key
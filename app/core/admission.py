@@ -0,0 +1,206 @@
+# api/app/core/admission.py
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+class _TenantState:
+    __slots__ = ("tokens", "updated", "reads", "writes", "admitted", "rejected")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+        self.reads = 0
+        self.writes = 0
+        self.admitted = 0
+        self.rejected = 0
+
+
+class _ShardState:
+    __slots__ = ("reads", "in_flight")
+
+    def __init__(self):
+        self.reads = 0
+        self.in_flight = 0
+
+
+class AdmissionController:
+    """Per-tenant token buckets and concurrency caps, checked before a pool checkout.
+
+    Each shard has its own pool, so in-flight requests are also capped per
+    shard at `pool_capacity`, and reads there are held `write_reserve`
+    connections lower so writes always find a free one. Reads also get a
+    smaller per-tenant cap than writes.
+
+    Tenant state is dropped once it has nothing in flight and its bucket has
+    refilled, and at most `max_tenants` entries are kept, oldest first out.
+    """
+
+    def __init__(self, max_concurrency: int, max_read_concurrency: int, rate: float, burst: int,
+                 pool_capacity: int, write_reserve: int, max_tenants: int = 10000):
+        self.max_concurrency = max_concurrency
+        self.max_read_concurrency = min(max_read_concurrency, max_concurrency)
+        self.rate = rate
+        self.burst = float(burst)
+        self.max_in_flight = max(1, pool_capacity)
+        self.max_global_reads = max(1, pool_capacity - write_reserve)
+        self.max_tenants = max_tenants
+        self._tenants: "OrderedDict[str, _TenantState]" = OrderedDict()
+        self._shards: dict[str, _ShardState] = {}
+
+    def try_acquire(self, tenant_id: str, is_write: bool, shard: str = "default") -> Optional[float]:
+        """Admit the request and return None, or return seconds to wait before retrying."""
+        now = time.monotonic()
+        st = self._tenants.get(tenant_id)
+        if st is None:
+            st = self._tenants[tenant_id] = _TenantState(self.burst, now)
+        else:
+            self._tenants.move_to_end(tenant_id)
+        self._evict(now, keep=tenant_id)
+        sh = self._shards.get(shard)
+        if sh is None:
+            sh = self._shards[shard] = _ShardState()
+        st.tokens = min(self.burst, st.tokens + (now - st.updated) * self.rate)
+        st.updated = now
+
+        if st.reads + st.writes >= self.max_concurrency or sh.in_flight >= self.max_in_flight:
+            retry = 1.0
+        elif not is_write and (st.reads >= self.max_read_concurrency
+                               or sh.reads >= self.max_global_reads):
+            retry = 1.0
+        elif st.tokens < 1.0:
+            retry = (1.0 - st.tokens) / self.rate
+        else:
+            st.tokens -= 1.0
+            sh.in_flight += 1
+            if is_write:
+                st.writes += 1
+            else:
+                st.reads += 1
+                sh.reads += 1
+            st.admitted += 1
+            return None
+        st.rejected += 1
+        return retry
+
+    def release(self, tenant_id: str, is_write: bool, shard: str = "default") -> None:
+        st = self._tenants[tenant_id]
+        sh = self._shards[shard]
+        sh.in_flight -= 1
+        if is_write:
+            st.writes -= 1
+        else:
+            st.reads -= 1
+            sh.reads -= 1
+
+    def _evict(self, now: float, keep: str) -> None:
+        # A tenant idle long enough to refill its bucket looks exactly like a
+        # new one, so dropping it loses nothing; over the cap, the least
+        # recently seen go first. In-flight tenants stay for release(), and so
+        # does the tenant being admitted.
+        refill = self.burst / self.rate
+        for _ in range(len(self._tenants)):
+            tenant, st = next(iter(self._tenants.items()))
+            if len(self._tenants) <= self.max_tenants and now - st.updated < refill:
+                return
+            if st.reads or st.writes or tenant == keep:
+                self._tenants.move_to_end(tenant)
+            else:
+                del self._tenants[tenant]
+
+    def snapshot(self) -> dict:
+        return {
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "max_read_concurrency": self.max_read_concurrency,
+                "rate_per_sec": self.rate,
+                "burst": self.burst,
+                "max_in_flight_per_shard": self.max_in_flight,
+                "max_reads_per_shard": self.max_global_reads,
+            },
+            "shards": {name: {"in_flight": sh.in_flight, "reads": sh.reads} for name, sh in self._shards.items()},
+            "tenants": {
+                t: {"reads": st.reads, "writes": st.writes, "tokens": round(st.tokens, 2),
+                    "admitted": st.admitted, "rejected": st.rejected}
+                for t, st in self._tenants.items()
+            },
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying AdmissionController to /v1 HTTP requests.
+
+    The tenant is read from where the handlers read it: the tenant_id query
+    parameter, else the tenant_id field of a JSON body. `shard_of` maps it to
+    the shard whose pool the request will use.
+    """
+
+    def __init__(self, app, controller: AdmissionController, prefix: str = "/v1/",
+                 exempt: tuple[str, ...] = (), shard_of: Callable[[str], str] = lambda tenant_id: "default"):
+        self.app = app
+        self.controller = controller
+        self.prefix = prefix
+        self.exempt = exempt
+        self.shard_of = shard_of
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(self.prefix) or path in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        tenant_id, receive = await self._tenant_of(scope, receive)
+        if tenant_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        is_write = scope["method"] not in ("GET", "HEAD", "OPTIONS")
+        shard = self.shard_of(tenant_id)
+        retry = self.controller.try_acquire(tenant_id, is_write, shard)
+        if retry is not None:
+            resp = JSONResponse({"detail": "Too many requests for tenant"}, status_code=429,
+                                headers={"Retry-After": str(max(1, math.ceil(retry)))})
+            await resp(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(tenant_id, is_write, shard)
+
+    async def _tenant_of(self, scope, receive):
+        qs = parse_qs(scope.get("query_string", b"").decode())
+        if qs.get("tenant_id"):
+            return qs["tenant_id"][0], receive
+
+        headers = dict(scope.get("headers") or ())
+        if not headers.get(b"content-type", b"").startswith(b"application/json"):
+            return None, receive
+
+        # Buffer the body so the tenant can be read and then replayed downstream.
+        chunks, more = [], True
+        while more:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            tenant = orjson.loads(body).get("tenant_id") if body else None
+        except (orjson.JSONDecodeError, AttributeError):
+            tenant = None
+        return (str(tenant) if tenant else None), replay
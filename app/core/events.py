@@ -0,0 +1,195 @@
+# api/app/core/events.py
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+import orjson
+from sqlalchemy import text
+
+from app.core.serialization import dumps
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "inventory_changes"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+MAX_PAYLOAD = 7900
+RESYNC = {"type": "resync"}
+
+
+def publish_event(conn, event: dict, trim: Optional[str] = None) -> None:
+    """Queue an event on the open transaction; Postgres only delivers it on commit.
+
+    If the payload is too large, the `trim` key is nulled so subscribers refetch.
+    """
+    payload = dumps(event)
+    if len(payload) > MAX_PAYLOAD and trim:
+        event[trim] = None
+        payload = dumps(event)
+    conn.execute(text("select pg_notify(:c, :p)"), {"c": CHANNEL, "p": payload.decode()})
+
+
+def publish_inventory_change(conn, tenant_id: str, location_id: str, reason: str,
+                             ref_id: Optional[str], lines: list[dict]) -> None:
+    # Subscribers are keyed on canonical UUID strings; request ids may differ in case.
+    publish_event(conn, {"type": "inventory", "tenant_id": str(uuid.UUID(str(tenant_id))),
+                         "location_id": str(uuid.UUID(str(location_id))),
+                         "reason": reason, "ref_id": ref_id, "lines": lines}, trim="lines")
+
+
+class Subscription:
+    """Bounded per-client queue. None in the queue means the stream is over."""
+
+    def __init__(self, tenant_id: str, location_id: Optional[str], maxsize: int):
+        self.tenant_id = tenant_id
+        self.location_id = location_id
+        self.closed = False
+        self.queue: asyncio.Queue = asyncio.Queue(max(2, maxsize))
+
+    def offer(self, event: dict) -> None:
+        if self.closed:
+            return
+        if self.location_id and event.get("location_id") not in (None, self.location_id):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop what it has not read yet and tell it to refetch
+            # instead of letting one client hold events for everyone else.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    def close(self) -> None:
+        """End the stream with a resync, so the client reconnects and refetches."""
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESYNC)
+        self.queue.put_nowait(None)
+
+
+class InventoryListener:
+    """One LISTEN connection per process, fanned out to in-process subscribers per tenant."""
+
+    def __init__(self, engine, channel: str = CHANNEL, queue_size: int = 256, retry_after: float = 1.0):
+        self.engine = engine
+        self.channel = channel
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self._subs: dict[str, set[Subscription]] = {}
+        self._conn = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._reconnect(delay=0)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._close()
+        self._loop = None
+
+    def subscribe(self, tenant_id: str, location_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(tenant_id, location_id, self.queue_size)
+        self._subs.setdefault(tenant_id, set()).add(sub)
+        return sub
+
+    def close_tenants(self, tenants: set[str]) -> None:
+        """End the streams of tenants that moved to another shard; thread-safe.
+
+        Their events are now published on the other shard's database, so
+        clients have to reconnect (and land on that shard's listener).
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._close_tenants, set(tenants))
+
+    def _close_tenants(self, tenants: set[str]) -> None:
+        for tenant_id in tenants & self._subs.keys():
+            for sub in tuple(self._subs[tenant_id]):
+                sub.close()
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.tenant_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.tenant_id]
+
+    def _open(self):
+        """Open the LISTEN connection; blocking, so it runs on a worker thread."""
+        dialect = self.engine.dialect
+        cargs, cparams = dialect.create_connect_args(self.engine.url)
+        conn = dialect.loaded_dbapi.connect(*cargs, **cparams)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.channel}")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _reconnect(self, delay: float) -> None:
+        if self._loop is not None and (self._task is None or self._task.done()):
+            self._task = self._loop.create_task(self._connect(delay))
+
+    async def _connect(self, delay: float) -> None:
+        # libpq can block for its whole connect timeout while the DB is down,
+        # so only add_reader runs on the event loop.
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                conn = await asyncio.to_thread(self._open)
+                break
+            except Exception:
+                log.exception("inventory listener: connect failed, retrying in %.1fs", self.retry_after)
+                delay = self.retry_after
+        if self._loop is None:
+            conn.close()
+            return
+        self._conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+
+    def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._loop is not None:
+            self._loop.remove_reader(conn.fileno())
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _on_readable(self) -> None:
+        conn = self._conn
+        try:
+            conn.poll()
+        except Exception:
+            log.exception("inventory listener: connection lost")
+            self._close()
+            # Anything sent while we were away is gone; make every client refetch.
+            self._broadcast(RESYNC)
+            self._reconnect(self.retry_after)
+            return
+        while conn.notifies:
+            note = conn.notifies.pop(0)
+            try:
+                event = orjson.loads(note.payload)
+            except orjson.JSONDecodeError:
+                log.warning("inventory listener: dropping malformed payload")
+                continue
+            for sub in tuple(self._subs.get(event.get("tenant_id"), ())):
+                sub.offer(event)
+
+    def _broadcast(self, event: dict) -> None:
+        for subs in tuple(self._subs.values()):
+            for sub in tuple(subs):
+                sub.offer(event)
@@ -0,0 +1,36 @@
+# api/app/core/serialization.py
+from decimal import Decimal
+from typing import Any, Mapping
+
+import orjson
+from fastapi.responses import Response
+
+
+def _default(obj: Any):
+    # orjson handles UUID/datetime/date natively; Decimal goes out as a string
+    # so NUMERIC columns keep their exact scale on the wire.
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def rows_as_dicts(result) -> list[dict]:
+    """Turn a SQLAlchemy Result into plain dicts without going through RowMapping."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded straight to bytes, bypassing jsonable_encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
@@ -0,0 +1,139 @@
+# api/app/core/sharding.py
+import asyncio
+import hashlib
+import logging
+import threading
+from bisect import bisect_right
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, text
+
+log = logging.getLogger(__name__)
+
+OVERRIDES_SQL = text("select tenant_id::text, shard, frozen from tenant_shard")
+
+
+class TenantFrozen(Exception):
+    """Writes for the tenant are paused while it is being moved between shards."""
+
+    def __init__(self, tenant_id: str):
+        super().__init__(f"tenant {tenant_id} is being moved")
+        self.tenant_id = tenant_id
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class ShardMap:
+    """tenant_id -> shard name: explicit overrides first, then a consistent-hash ring.
+
+    Static overrides come from settings; dynamic ones (and write freezes used
+    by scripts/move_tenant.py) live in the tenant_shard table on the
+    directory shard and are reloaded by `refresh()`.
+    """
+
+    def __init__(self, shards: dict[str, str], overrides: Optional[dict[str, str]] = None,
+                 vnodes: int = 64, directory: Optional[str] = None):
+        if not shards:
+            raise ValueError("at least one shard is required")
+        self.urls = dict(shards)
+        self.directory = directory or next(iter(self.urls))
+        self.static_overrides = {k.lower(): v for k, v in (overrides or {}).items()}
+        for name in self.static_overrides.values():
+            if name not in self.urls:
+                raise ValueError(f"override points at unknown shard {name!r}")
+        ring = sorted((_hash(f"{name}#{i}"), name) for name in self.urls for i in range(vnodes))
+        self._points = [p for p, _ in ring]
+        self._names = [n for _, n in ring]
+        self._dynamic: dict[str, str] = {}
+        self._frozen: frozenset[str] = frozenset()
+
+    def hashed_shard(self, tenant_id: str) -> str:
+        i = bisect_right(self._points, _hash(tenant_id.lower())) % len(self._points)
+        return self._names[i]
+
+    def shard_for(self, tenant_id: str) -> str:
+        key = tenant_id.lower()
+        return (self._dynamic.get(key) or self.static_overrides.get(key)
+                or self.hashed_shard(key))
+
+    def is_frozen(self, tenant_id: str) -> bool:
+        return tenant_id.lower() in self._frozen
+
+    def load_overrides(self, rows) -> set[str]:
+        """Replace the dynamic overrides; returns the tenants whose shard changed."""
+        dynamic, frozen = {}, set()
+        for tenant_id, shard, is_frozen in rows:
+            if shard not in self.urls:
+                log.warning("shard map: tenant %s points at unknown shard %r, ignored", tenant_id, shard)
+                continue
+            dynamic[tenant_id.lower()] = shard
+            if is_frozen:
+                frozen.add(tenant_id.lower())
+        before = {t: self.shard_for(t) for t in self._dynamic.keys() | dynamic.keys()}
+        # Swap whole objects so readers never see a half-applied update.
+        self._dynamic, self._frozen = dynamic, frozenset(frozen)
+        return {t for t, shard in before.items() if self.shard_for(t) != shard}
+
+
+class ShardRegistry:
+    """One engine per shard, plus tenant routing through a ShardMap.
+
+    `on_moved` is called, from the refreshing thread, with the tenants whose
+    shard changed on a refresh.
+    """
+
+    def __init__(self, shard_map: ShardMap, refresh_interval: float = 5.0,
+                 on_engine: Optional[Callable] = None,
+                 on_moved: Optional[Callable[[set[str]], None]] = None, **engine_kwargs):
+        self.map = shard_map
+        self.refresh_interval = refresh_interval
+        self.on_moved = on_moved
+        self.engines = {name: create_engine(url, **engine_kwargs) for name, url in shard_map.urls.items()}
+        if on_engine is not None:
+            for eng in self.engines.values():
+                on_engine(eng)
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    @property
+    def default_engine(self):
+        return self.engines[self.map.directory]
+
+    def engine_for(self, tenant_id: str, write: bool = False):
+        """Engine for the tenant's shard; raises TenantFrozen for writes during a move."""
+        tenant_id = str(tenant_id)
+        if write and self.map.is_frozen(tenant_id):
+            raise TenantFrozen(tenant_id)
+        return self.engines[self.map.shard_for(tenant_id)]
+
+    def refresh(self, raise_errors: bool = False) -> None:
+        """Reload tenant_shard. Failures keep the previous map and are logged,
+        unless `raise_errors` is set (tools must not act on a stale map)."""
+        with self._lock:
+            try:
+                with self.default_engine.begin() as conn:
+                    moved = self.map.load_overrides(conn.execute(OVERRIDES_SQL))
+            except Exception:
+                if raise_errors:
+                    raise
+                log.exception("shard map: refreshing overrides failed")
+                return
+        if moved and self.on_moved is not None:
+            self.on_moved(moved)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.refresh)
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await asyncio.to_thread(self.refresh)
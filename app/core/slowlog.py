@@ -0,0 +1,143 @@
+# api/app/core/slowlog.py
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\((\w+)\)s|%s|\$\d+|(?<!:):\w+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_WRITE = re.compile(r"\b(insert|update|delete|merge)\b")
+# Statements that lock or have side effects even as a SELECT.
+_SIDE_EFFECT = re.compile(r"\b(pg_advisory\w*|pg_notify|nextval|setval|pg_sleep)\s*\(|\bfor (no key )?(update|share)\b")
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize SQL so that statements differing only in literals/params group together."""
+    s = _COMMENT.sub(" ", statement)
+    s = _STRING.sub("?", s)
+    s = _PARAM.sub("?", s)
+    s = _NUMBER.sub("?", s)
+    s = _IN_LIST.sub("(?)", s)
+    return _SPACE.sub(" ", s).strip().lower()
+
+
+class SlowQuerySampler:
+    """Records statements slower than `threshold_ms`, keeping the worst few per fingerprint.
+
+    Fast statements cost one perf_counter() call and a comparison. Plans are
+    captured on a separate connection by a background thread so the request
+    that was slow is not made slower.
+    """
+
+    def __init__(self, threshold_ms: float = 200.0, examples: int = 3, max_fingerprints: int = 200,
+                 explain: bool = True, explain_timeout_ms: float = 5000):
+        self.threshold = threshold_ms / 1000.0
+        self.examples = examples
+        self.max_fingerprints = max_fingerprints
+        self.explain = explain
+        self.explain_timeout_ms = explain_timeout_ms
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._jobs: queue.Queue = queue.Queue(maxsize=32)
+        self._worker: Optional[threading.Thread] = None
+
+    def install(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        if self.explain and self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="slowlog-explain", daemon=True)
+            self._worker.start()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._slowlog_t0 = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slowlog_t0
+        if elapsed < self.threshold:
+            return
+        self._record(statement, parameters[0] if executemany and parameters else parameters, elapsed,
+                     conn.engine)
+
+    def _record(self, statement: str, parameters, elapsed: float, engine=None) -> None:
+        fp = fingerprint(statement)
+        ms = round(elapsed * 1000, 2)
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is None:
+                entry = self._entries[fp] = {
+                    "id": hashlib.sha1(fp.encode()).hexdigest()[:12],
+                    "fingerprint": fp,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "examples": [],
+                }
+                if len(self._entries) > self.max_fingerprints:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(fp)
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+
+            examples = entry["examples"]
+            if len(examples) >= self.examples and ms <= examples[-1]["ms"]:
+                return
+            example = {"ms": ms, "at": time.time(), "statement": statement,
+                       "params": repr(parameters)[:500], "plan": None}
+            examples.append(example)
+            examples.sort(key=lambda e: e["ms"], reverse=True)
+            del examples[self.examples:]
+
+        if self.explain and engine is not None and statement.lstrip()[:6].lower().startswith(_EXPLAINABLE):
+            analyze = fp.startswith(("select", "with")) and not (_WRITE.search(fp) or _SIDE_EFFECT.search(fp))
+            self._submit(engine, example, statement, parameters, analyze)
+
+    def _submit(self, engine, example: dict, statement: str, parameters, analyze: bool) -> None:
+        try:
+            self._jobs.put_nowait((engine, example, statement, parameters, analyze))
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            engine, example, statement, parameters, analyze = self._jobs.get()
+            # Only plain reads are re-executed; writes, locking reads and calls like
+            # pg_advisory_xact_lock() or pg_notify() are only planned.
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+            try:
+                raw = engine.raw_connection()
+                try:
+                    cur = raw.cursor()
+                    cur.execute(f"set local statement_timeout = {int(self.explain_timeout_ms)}")
+                    cur.execute(prefix + statement, parameters or None)
+                    example["plan"] = "\n".join(r[0] for r in cur.fetchall())
+                    cur.close()
+                finally:
+                    raw.rollback()
+                    raw.close()
+            except Exception as e:
+                example["plan"] = f"explain failed: {e}"
+                log.debug("slowlog: explain failed", exc_info=True)
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            entries = [dict(e, examples=[dict(x) for x in e["examples"]]) for e in self._entries.values()]
+        for e in entries:
+            e["avg_ms"] = round(e["total_ms"] / e["count"], 2)
+            e["total_ms"] = round(e["total_ms"], 2)
+        entries.sort(key=lambda e: e["max_ms"], reverse=True)
+        return entries
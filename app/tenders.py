@@ -0,0 +1,231 @@
+# api/app/tenders.py
+import asyncio
+import importlib
+import logging
+import random
+import time
+from typing import Callable, NamedTuple, Optional, Protocol
+
+from sqlalchemy import text
+
+from app.core.events import publish_event
+from app.core.serialization import dumps, rows_as_dicts
+
+log = logging.getLogger(__name__)
+
+# Tenders settled at the counter; everything else goes through the processor.
+IMMEDIATE_METHODS = frozenset({"cash"})
+
+
+class Settlement(NamedTuple):
+    tender_id: str
+    status: str  # 'approved' | 'returned'
+    details: dict = {}
+
+
+class TenderProcessor(Protocol):
+    async def settle(self, tenders: list[dict]) -> list[Settlement]:
+        """Settle a batch. Tenders missing from the result stay pending and are retried.
+
+        Must be idempotent per tender id: a worker that dies or times out after
+        the processor accepted a tender, but before the result is stored, has
+        it submitted again once its lease expires.
+        """
+        ...
+
+
+class StubProcessor:
+    """Local processor for tests and benchmarks.
+
+    Approves everything after `latency` seconds, except tenders whose
+    details contain {"stub": "decline"}.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def settle(self, tenders: list[dict]) -> list[Settlement]:
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        return [
+            Settlement(str(t["id"]),
+                       "returned" if (t["details"] or {}).get("stub") == "decline" else "approved",
+                       {"processor": "stub"})
+            for t in tenders
+        ]
+
+
+CLAIM_SQL = text("""
+    select t.id, t.tenant_id, t.sale_id, s.location_id, t.method, t.amount, t.details, t.created_at
+    from sale_tender t
+    join sale s on s.id = t.sale_id
+    where t.status = 'pending'
+      and (t.claimed_at is null or t.claimed_at < now() - make_interval(secs => :lease))
+      and not (t.tenant_id = any(cast(:skip as uuid[])))
+    order by t.created_at
+    limit :n
+    for update of t skip locked
+""")
+
+LEASE_SQL = text("update sale_tender set claimed_at = now() where id = any(cast(:ids as uuid[]))")
+
+APPLY_SQL = text("""
+    update sale_tender t
+    set status = u.status,
+        details = t.details || u.details,
+        claimed_at = null
+    from unnest(cast(:ids as uuid[]), cast(:statuses as text[]), cast(:details as jsonb[]))
+      as u(id, status, details)
+    where t.id = u.id and t.status = 'pending'
+    returning t.id
+""")
+
+STATUS_SQL = text("""
+    select id, method, amount, status, details, created_at
+    from sale_tender
+    where sale_id = :sid and tenant_id = cast(:t as uuid)
+    order by created_at, id
+""")
+
+
+def load_processor(path: str) -> TenderProcessor:
+    """Instantiate a processor from a 'module:Class' path."""
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+class TenderSettler:
+    """Pool of async workers settling pending tenders in batches.
+
+    A batch is claimed by stamping claimed_at in a short FOR UPDATE SKIP LOCKED
+    transaction, so no transaction or pooled connection is held while the
+    processor runs; other workers skip the rows for `lease` seconds. The
+    processor gets `timeout` seconds, and a batch that times out or whose
+    worker crashes is claimed again once the lease expires. Tenants for which
+    `owns` is false (copies left by a shard move, or tenants frozen mid-move)
+    are left untouched.
+    """
+
+    def __init__(self, engine, processor: TenderProcessor, workers: int = 4, batch_size: int = 50,
+                 poll_interval: float = 1.0, timeout: float = 30.0, lease: float = 60.0,
+                 owns: Callable[[str], bool] = lambda tenant_id: True):
+        self.engine = engine
+        self.timeout = timeout
+        self.lease = max(lease, timeout)
+        self.owns = owns
+        self._foreign: set[str] = set()
+        self.processor = processor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.settled = 0
+        self.batches = 0
+        self.failures = 0
+        self.latencies: list[float] = []
+        self._tasks: list[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers; safe to call from request threads."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def stats(self) -> dict:
+        lat = sorted(self.latencies[-1000:])
+
+        def pct(p: float) -> Optional[float]:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None
+
+        return {"settled": self.settled, "batches": self.batches, "failures": self.failures,
+                "latency_ms": {"p50": pct(0.50), "p99": pct(0.99)}}
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            try:
+                done = await self.settle_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                log.exception("tender worker %d: batch failed", n)
+                done = 0
+            if done < self.batch_size:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def settle_once(self) -> int:
+        rows = await asyncio.to_thread(self._claim)
+        if not rows:
+            return 0
+        try:
+            results = await asyncio.wait_for(self.processor.settle(rows), self.timeout)
+        except asyncio.TimeoutError:
+            # The rows stay leased, so a hung processor is retried at most once per lease.
+            self.failures += 1
+            log.warning("tender settler: processor timed out on %d tenders", len(rows))
+            return 0
+        applied = await asyncio.to_thread(self._apply, rows, results)
+
+        now = time.time()
+        self.batches += 1
+        self.settled += len(applied)
+        created = {str(r["id"]): r["created_at"].timestamp() for r in rows}
+        self.latencies.extend(now - created[s.tender_id] for s in applied if s.tender_id in created)
+        del self.latencies[:-10000]
+        # Count only what was settled so unsettled leftovers back off instead of spinning.
+        return len(applied)
+
+    def _claim(self) -> list[dict]:
+        self._foreign = {t for t in self._foreign if not self.owns(t)}
+        with self.engine.begin() as conn:
+            rows = rows_as_dicts(conn.execute(CLAIM_SQL, {"n": self.batch_size, "lease": self.lease,
+                                                          "skip": list(self._foreign)}))
+            foreign = {str(r["tenant_id"]) for r in rows if not self.owns(str(r["tenant_id"]))}
+            if foreign:
+                # Left unleased and skipped from now on.
+                self._foreign |= foreign
+                rows = [r for r in rows if str(r["tenant_id"]) not in foreign]
+            if rows:
+                conn.execute(LEASE_SQL, {"ids": [str(r["id"]) for r in rows]})
+        return rows
+
+    def _apply(self, rows: list[dict], results: list[Settlement]) -> list[Settlement]:
+        if not results:
+            return []
+        with self.engine.begin() as conn:
+            # A tender already settled by a worker that re-claimed it after our
+            # lease expired is not overwritten or announced twice.
+            updated = {str(r[0]) for r in conn.execute(APPLY_SQL, {
+                "ids": [s.tender_id for s in results],
+                "statuses": [s.status for s in results],
+                "details": [dumps(s.details or {}).decode() for s in results],
+            })}
+            applied = [s for s in results if s.tender_id in updated]
+            by_id = {str(r["id"]): r for r in rows}
+            for s in applied:
+                row = by_id.get(s.tender_id)
+                if row is None:
+                    continue
+                publish_event(conn, {"type": "tender", "tenant_id": str(row["tenant_id"]),
+                                     "location_id": str(row["location_id"]), "sale_id": str(row["sale_id"]),
+                                     "tender_id": s.tender_id, "status": s.status})
+        return applied
+
+
+def tender_status(conn, sale_id: str, tenant_id: str) -> list[dict]:
+    return rows_as_dicts(conn.execute(STATUS_SQL, {"sid": sale_id, "t": tenant_id}))
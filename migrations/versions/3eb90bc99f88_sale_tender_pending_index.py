@@ -0,0 +1,35 @@
+"""sale_tender pending index and claim lease
+
+Revision ID: 3eb90bc99f88
+Revises: c520a505929c
+Create Date: 2026-10-18 23:40:12.511204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3eb90bc99f88'
+down_revision: Union[str, Sequence[str], None] = 'c520a505929c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # set when a settlement worker takes a pending tender; others skip it until the lease expires
+    op.add_column('sale_tender', sa.Column('claimed_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    # settlement workers claim the oldest pending tenders first
+    op.create_index(
+        'ix_sale_tender_pending', 'sale_tender', ['created_at'], unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sale_tender_pending', table_name='sale_tender')
+    op.drop_column('sale_tender', 'claimed_at')
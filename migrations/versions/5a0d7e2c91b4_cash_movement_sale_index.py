@@ -0,0 +1,34 @@
+"""cash_movement sale index
+
+Revision ID: 5a0d7e2c91b4
+Revises: 3eb90bc99f88
+Create Date: 2026-10-19 13:05:22.640187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0d7e2c91b4'
+down_revision: Union[str, Sequence[str], None] = '3eb90bc99f88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GET /v1/sales/{id} gathers the sale's cash movements by sale_id
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_cash_movement_sale', 'cash_movement', ['sale_id'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_cash_movement_sale', table_name='cash_movement', postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""product search indexes
+
+Revision ID: 8d1f2c7a4b90
+Revises: 5a0d7e2c91b4
+Create Date: 2026-10-18 23:58:41.207519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f2c7a4b90'
+down_revision: Union[str, Sequence[str], None] = '5a0d7e2c91b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    # btree_gin lets the trigram index lead with tenant_id
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin;")
+    # product is written by the till all day; build without blocking inserts
+    with op.get_context().autocommit_block():
+        # SKU prefix lookups: lower(sku) LIKE 'abc%'
+        op.create_index(
+            'ix_product_tenant_sku_prefix', 'product',
+            ['tenant_id', sa.text('lower(sku) text_pattern_ops')], unique=False,
+            postgresql_concurrently=True,
+        )
+        # name prefix lookups: lower(name) LIKE 'abc%'
+        op.create_index(
+            'ix_product_tenant_name_prefix', 'product',
+            ['tenant_id', sa.text('lower(name) text_pattern_ops')], unique=False,
+            postgresql_concurrently=True,
+        )
+        # fuzzy name matches (queries of 3+ characters): LIKE '%abc%' and %
+        op.create_index(
+            'ix_product_tenant_name_trgm', 'product',
+            ['tenant_id', sa.text('lower(name) gin_trgm_ops')], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_product_tenant_name_trgm', table_name='product', postgresql_concurrently=True)
+        op.drop_index('ix_product_tenant_name_prefix', table_name='product', postgresql_concurrently=True)
+        op.drop_index('ix_product_tenant_sku_prefix', table_name='product', postgresql_concurrently=True)
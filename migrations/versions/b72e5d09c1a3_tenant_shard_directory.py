@@ -0,0 +1,36 @@
+"""tenant_shard directory
+
+Revision ID: b72e5d09c1a3
+Revises: 8d1f2c7a4b90
+Create Date: 2026-10-19 00:21:06.873310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b72e5d09c1a3'
+down_revision: Union[str, Sequence[str], None] = '8d1f2c7a4b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only read on the directory shard; harmless (and empty) elsewhere.
+    op.create_table(
+        'tenant_shard',
+        sa.Column('tenant_id', pg.UUID(as_uuid=True), primary_key=True),
+        sa.Column('shard', sa.Text(), nullable=False),
+        sa.Column('frozen', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tenant_shard')
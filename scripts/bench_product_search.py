@@ -0,0 +1,77 @@
+# scripts/bench_product_search.py
+"""Product search and SKU autocomplete latency over a large catalog.
+
+Seeds `products` rows for a throwaway tenant in the DATABASE_URL database
+(migrated to head), then times /v1/products/search queries and the
+in-memory autocomplete index. The tenant is deleted afterwards.
+
+    python -m scripts.bench_product_search [products] [queries]
+"""
+import random
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.catalog import SkuPrefixIndex, search_products
+from app.main import engine
+
+
+def seed(tenant: str, n: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("""
+            insert into product (tenant_id, sku, name, category)
+            select :t, 'SKU' || lpad(g::text, 7, '0'),
+                   (array['Cola','Chips','Water','Soap','Rice','Tea','Milk','Bread'])[1 + g % 8]
+                     || ' ' || (g % 977) || 'g #' || g,
+                   'bench'
+            from generate_series(1, :n) g
+        """), {"t": tenant, "n": n})
+        conn.execute(text("analyze product"))
+
+
+def timed(fn, args_list) -> list[float]:
+    out = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        out.append(time.perf_counter() - t0)
+    return sorted(out)
+
+
+def report(name: str, samples: list[float]) -> None:
+    print(f"{name:>28}: p50={statistics.median(samples) * 1000:7.3f} ms "
+          f"p99={samples[int(0.99 * (len(samples) - 1))] * 1000:7.3f} ms")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    q = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    tenant = str(uuid.uuid4())
+    rnd = random.Random(7)
+    seed(tenant, n)
+    try:
+        def db_search(term):
+            with engine.begin() as conn:
+                search_products(conn, tenant, term, 20, 0)
+
+        sku_terms = [(f"sku{rnd.randrange(n):07d}"[:rnd.randint(4, 9)],) for _ in range(q)]
+        name_terms = [(rnd.choice(["cola", "chips 12", "soap", "milk 97"]),) for _ in range(q)]
+        report("search: sku prefix", timed(db_search, sku_terms))
+        report("search: name", timed(db_search, name_terms))
+
+        index = SkuPrefixIndex(lambda _: engine)
+        t0 = time.perf_counter()
+        index.complete(tenant, "sku")
+        print(f"{'autocomplete: initial load':>28}: {(time.perf_counter() - t0) * 1000:9.1f} ms")
+        report("autocomplete: sku prefix",
+               timed(lambda p: index.complete(tenant, p, 10), [(t[0],) for t in sku_terms * 10]))
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("delete from product where tenant_id = :t"), {"t": tenant})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# scripts/bench_sale_read.py
+"""GET /v1/sales/{id} latency for a 1-line sale vs a 100-line sale.
+
+Needs a migrated dev database (DATABASE_URL). Each sale gets a cash tender
+and its cash_movement row, next to `background` unrelated cash movements,
+so a missing index on cash_movement.sale_id shows up as latency.
+
+    python -m scripts.bench_sale_read [requests] [background]
+"""
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app, engine
+
+
+def seed(lines: int, background: int) -> tuple[str, str, str]:
+    tenant, loc = str(uuid.uuid4()), str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(text("insert into location (id, tenant_id, name) values (:l, :t, 'bench')"),
+                     {"l": loc, "t": tenant})
+        sale_id = conn.execute(text("""
+            insert into sale (tenant_id, location_id, subtotal, tax, total)
+            values (:t, :l, :n, 0, :n) returning id
+        """), {"t": tenant, "l": loc, "n": lines}).scalar_one()
+        conn.execute(text("""
+            insert into product (tenant_id, sku, name)
+            select :t, 'bench-' || g, 'bench ' || g from generate_series(1, :n) g
+        """), {"t": tenant, "n": lines})
+        conn.execute(text("""
+            insert into sale_item (tenant_id, sale_id, product_id, qty, unit_price)
+            select :t, :sid, p.id, 1, 1 from product p where p.tenant_id = :t
+        """), {"t": tenant, "sid": sale_id})
+        conn.execute(text("""
+            insert into sale_tender (tenant_id, sale_id, method, amount) values (:t, :sid, 'cash', :n)
+        """), {"t": tenant, "sid": sale_id, "n": lines})
+        conn.execute(text("""
+            insert into cash_movement (tenant_id, location_id, sale_id, type, amount, note)
+            values (:t, :l, :sid, 'cash_sale', :n, 'cash tender')
+        """), {"t": tenant, "l": loc, "sid": sale_id, "n": lines})
+        conn.execute(text("""
+            insert into cash_movement (tenant_id, location_id, type, amount)
+            select :t, :l, 'float_in', 1 from generate_series(1, :n)
+        """), {"t": tenant, "l": loc, "n": background})
+        conn.execute(text("analyze cash_movement"))
+    return tenant, loc, str(sale_id)
+
+
+def cleanup(tenant: str, loc: str, sale_id: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("delete from cash_movement where tenant_id = :t"), {"t": tenant})
+        conn.execute(text("delete from sale where id = :s"), {"s": sale_id})
+        conn.execute(text("delete from product where tenant_id = :t"), {"t": tenant})
+        conn.execute(text("delete from location where id = :l"), {"l": loc})
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    background = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    client = TestClient(app)
+    medians = {}
+    for lines in (1, 100):
+        tenant, loc, sale_id = seed(lines, background)
+        try:
+            for _ in range(20):
+                client.get(f"/v1/sales/{sale_id}", params={"tenant_id": tenant})
+            samples = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                client.get(f"/v1/sales/{sale_id}", params={"tenant_id": tenant}).raise_for_status()
+                samples.append(time.perf_counter() - t0)
+        finally:
+            cleanup(tenant, loc, sale_id)
+        samples.sort()
+        medians[lines] = statistics.median(samples)
+        print(f"{lines:>4} lines: p50={medians[lines] * 1000:.2f} ms "
+              f"p99={samples[int(0.99 * len(samples))] * 1000:.2f} ms")
+    print(f"ratio 100/1: {medians[100] / medians[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
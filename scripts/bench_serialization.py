@@ -0,0 +1,69 @@
+# scripts/bench_serialization.py
+"""Compare the old list-endpoint path with app.core.serialization, end to end.
+
+Runs an inventory-shaped query (UUIDs and NUMERIC, generated server-side, so
+nothing is seeded) against DATABASE_URL and times both paths from the same
+result shape:
+
+  current: .mappings().all() -> jsonable_encoder -> JSONResponse
+  fast:    rows_as_dicts()   -> FastJSONResponse (orjson)
+
+    python -m scripts.bench_serialization [rows]
+"""
+import sys
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.core.serialization import FastJSONResponse, rows_as_dicts
+from app.main import engine
+
+ROWS_SQL = text("""
+    select cast(:t as uuid) as tenant_id,
+           cast(md5(g::text) as uuid) as product_id,
+           cast(md5((g % 8)::text) as uuid) as location_id,
+           (g % 500 + 0.250)::numeric(14, 3) as on_hand
+    from generate_series(1, :n) g
+""")
+
+
+PATHS = {
+    "mappings+jsonable_encoder": (
+        lambda result: result.mappings().all(),
+        lambda rows: JSONResponse(jsonable_encoder({"data": rows})).body,
+    ),
+    "rows_as_dicts+orjson": (
+        rows_as_dicts,
+        lambda rows: FastJSONResponse({"data": rows}).body,
+    ),
+}
+
+
+def measure(convert, encode, n: int, repeat: int = 5) -> tuple[float, float]:
+    """Best (fetch+convert, encode) seconds over `repeat` runs."""
+    best = (float("inf"), float("inf"))
+    for _ in range(repeat):
+        with engine.connect() as conn:
+            t0 = time.perf_counter()
+            rows = convert(conn.execute(ROWS_SQL, {"t": str(uuid.uuid4()), "n": n}))
+            t1 = time.perf_counter()
+            encode(rows)
+            t2 = time.perf_counter()
+        if t2 - t0 < sum(best):
+            best = (t1 - t0, t2 - t1)
+    return best
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    for name, (convert, encode) in PATHS.items():
+        fetch, enc = measure(convert, encode, n)
+        print(f"{name:>26}: fetch+convert {fetch * 1000:8.1f} ms  encode {enc * 1000:8.1f} ms  "
+              f"total {(fetch + enc) * 1000:8.1f} ms for {n} rows")
+
+
+if __name__ == "__main__":
+    main()
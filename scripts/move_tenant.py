@@ -0,0 +1,182 @@
+# scripts/move_tenant.py
+"""Move a tenant to another shard while it keeps serving traffic.
+
+    python -m scripts.move_tenant <tenant_id> <target_shard> [--purge] [--overlap SEC] [--batch N]
+
+1. Bulk-copy the tenant's rows to the target (reads and writes continue).
+2. Catch-up passes replay stock_movement and the other time-stamped tables
+   from a moving watermark until a pass copies little.
+3. Freeze writes via tenant_shard (API answers 503 + Retry-After), wait for
+   every process to see it, run a final pass and compare ledgers.
+4. Point tenant_shard at the target and unfreeze; --purge then deletes the
+   source copy.
+
+Shards come from the same settings as the API (SHARDS / DATABASE_URL), so
+several local Postgres databases can be used for testing.
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.main import shards
+
+# FK order. Tables with a timestamp are replayed from the watermark; the
+# small reference tables are recopied on every pass.
+TABLES = ["location", "product", "sale", "sale_item", "sale_tender", "cash_movement", "stock_movement", "alert"]
+JSONB_COLUMNS = {"metadata", "details", "payload"}
+
+SINCE_FILTERS = {
+    "location": "true",
+    "product": "true",
+    "sale": "created_at >= :since",
+    "sale_item": "sale_id in (select id from sale where tenant_id = :t and created_at >= :since)",
+    # Tenders still pending on the target may have been settled on the source since.
+    "sale_tender": "(created_at >= :since or id = any(cast(:pending as uuid[])))",
+    "cash_movement": "occurred_at >= :since",
+    "stock_movement": "occurred_at >= :since",
+    "alert": "(created_at >= :since or resolved_at >= :since)",
+}
+
+LEDGER_SQL = text("""
+    select (select count(*) from sale where tenant_id = :t) as sales,
+           (select count(*) from sale_tender where tenant_id = :t and status = 'pending') as pending,
+           (select count(*) from stock_movement where tenant_id = :t) as movements,
+           (select coalesce(sum(delta_qty), 0) from stock_movement where tenant_id = :t) as on_hand
+""")
+
+
+def upsert_sql(table: str, columns: list[str]):
+    cols = ", ".join(columns)
+    binds = ", ".join(f":{c}" for c in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+    stmt = text(f"insert into {table} ({cols}) values ({binds}) on conflict (id) do update set {updates}")
+    return stmt.bindparams(*(bindparam(c, type_=JSONB) for c in columns if c in JSONB_COLUMNS))
+
+
+def copy_table(src, dst, table: str, tenant_id: str, since, pending: list[str], batch: int) -> int:
+    where = "tenant_id = :t" if since is None else f"tenant_id = :t and {SINCE_FILTERS[table]}"
+    result = src.execution_options(stream_results=True, yield_per=batch).execute(
+        text(f"select * from {table} where {where}"),
+        {"t": tenant_id, "since": since, "pending": pending})
+    stmt, copied = None, 0
+    for chunk in result.mappings().partitions(batch):
+        rows = [dict(r) for r in chunk]
+        if stmt is None:
+            stmt = upsert_sql(table, list(rows[0].keys()))
+        dst.execute(stmt, rows)
+        copied += len(rows)
+    return copied
+
+
+def copy_pass(tenant_id: str, source: str, target: str, since, batch: int) -> tuple[int, object]:
+    """Copy everything changed since `since` (all rows if None); returns (rows, next watermark)."""
+    # One snapshot for the whole pass: under READ COMMITTED each table would see
+    # a later snapshot, and a sale committed between reading `sale` and
+    # `sale_item` would arrive without its parent. now() is the transaction
+    # start, so the watermark matches the snapshot too.
+    src_engine = shards.engines[source].execution_options(isolation_level="REPEATABLE READ",
+                                                          postgresql_readonly=True)
+    with src_engine.connect() as src, shards.engines[target].connect() as dst:
+        watermark = src.execute(text("select now()")).scalar_one()
+        pending = [str(r[0]) for r in dst.execute(
+            text("select id from sale_tender where tenant_id = :t and status = 'pending'"), {"t": tenant_id})]
+        total = 0
+        for table in TABLES:
+            n = copy_table(src, dst, table, tenant_id, since, pending, batch)
+            # Commit per table so a bulk copy is not one huge transaction on the target.
+            dst.commit()
+            print(f"  {table:<15} {n:>9} rows")
+            total += n
+    return total, watermark
+
+
+def set_directory(tenant_id: str, shard: str, frozen: bool) -> None:
+    with shards.default_engine.begin() as conn:
+        conn.execute(text("""
+            insert into tenant_shard (tenant_id, shard, frozen) values (:t, :s, :f)
+            on conflict (tenant_id) do update set shard = excluded.shard, frozen = excluded.frozen,
+                                                  updated_at = now()
+        """), {"t": tenant_id, "s": shard, "f": frozen})
+
+
+def ledger(shard: str, tenant_id: str) -> dict:
+    with shards.engines[shard].connect() as conn:
+        return dict(conn.execute(LEDGER_SQL, {"t": tenant_id}).mappings().one())
+
+
+def purge(shard: str, tenant_id: str) -> None:
+    with shards.engines[shard].begin() as conn:
+        for table in reversed(TABLES):
+            n = conn.execute(text(f"delete from {table} where tenant_id = :t"), {"t": tenant_id}).rowcount
+            print(f"  purged {table:<15} {n:>9} rows")
+        conn.execute(text("refresh materialized view inventory_current"))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("tenant_id")
+    ap.add_argument("target")
+    ap.add_argument("--purge", action="store_true", help="delete the source copy after cutover")
+    ap.add_argument("--overlap", type=float, default=300.0,
+                    help="seconds re-read before each watermark, to catch long-running transactions")
+    ap.add_argument("--batch", type=int, default=5000)
+    ap.add_argument("--max-passes", type=int, default=5)
+    ap.add_argument("--settle-rows", type=int, default=1000,
+                    help="stop catching up once a pass copies fewer rows than this")
+    args = ap.parse_args()
+
+    tenant, target = args.tenant_id.lower(), args.target
+    if target not in shards.engines:
+        print(f"unknown shard {target!r}; known: {', '.join(shards.engines)}", file=sys.stderr)
+        return 2
+    # A failed directory read must not fall back to the hash ring: for a tenant
+    # moved before, that names the wrong source.
+    shards.refresh(raise_errors=True)
+    source = shards.map.shard_for(tenant)
+    if source == target:
+        print(f"tenant {tenant} already lives on {target}")
+        return 0
+    overlap = timedelta(seconds=args.overlap)
+
+    print(f"moving {tenant}: {source} -> {target}")
+    print("bulk copy")
+    copied, watermark = copy_pass(tenant, source, target, None, args.batch)
+    for i in range(args.max_passes):
+        if copied < args.settle_rows:
+            break
+        print(f"catch-up pass {i + 1}")
+        copied, watermark = copy_pass(tenant, source, target, watermark - overlap, args.batch)
+
+    print("freezing writes")
+    set_directory(tenant, source, frozen=True)
+    try:
+        # Every API process reloads the directory at least this often; the extra
+        # time lets in-flight writes and tender batches finish.
+        time.sleep(shards.refresh_interval * 2 + 1)
+        print("final pass")
+        copy_pass(tenant, source, target, watermark - overlap, args.batch)
+        src_ledger, dst_ledger = ledger(source, tenant), ledger(target, tenant)
+        if src_ledger != dst_ledger:
+            print(f"ledger mismatch, aborting: source={src_ledger} target={dst_ledger}", file=sys.stderr)
+            set_directory(tenant, source, frozen=False)
+            return 1
+        with shards.engines[target].begin() as conn:
+            conn.execute(text("refresh materialized view inventory_current"))
+        set_directory(tenant, target, frozen=False)
+    except BaseException:
+        set_directory(tenant, source, frozen=False)
+        raise
+    print(f"cut over to {target}: {dst_ledger}")
+
+    if args.purge:
+        time.sleep(shards.refresh_interval * 2 + 1)
+        purge(source, tenant)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
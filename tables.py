@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy import (
+    Boolean,
     CheckConstraint,
     ForeignKey,
     Index,
@@ -11,6 +12,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -34,6 +36,9 @@ class Product(Base):
     __table_args__ = (
         UniqueConstraint("tenant_id", "sku", name="uq_product_tenant_sku"),
         Index("ix_product_tenant", "tenant_id"),
+        Index("ix_product_tenant_sku_prefix", "tenant_id", text("lower(sku) text_pattern_ops")),
+        Index("ix_product_tenant_name_prefix", "tenant_id", text("lower(name) text_pattern_ops")),
+        Index("ix_product_tenant_name_trgm", "tenant_id", text("lower(name) gin_trgm_ops"), postgresql_using="gin"),
     )
 
     # relationships (optional backrefs)
@@ -138,6 +143,7 @@ class SaleTender(Base):
     status: Mapped[str] = mapped_column(Text, nullable=False, default="approved")
     details: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
 
     __table_args__ = (
         CheckConstraint(
@@ -149,6 +155,7 @@ class SaleTender(Base):
             name="ck_sale_tender_status",
         ),
         Index("ix_sale_tender_sale", "sale_id"),
+        Index("ix_sale_tender_pending", "created_at", postgresql_where=text("status = 'pending'")),
     )
 
     sale: Mapped["Sale"] = relationship(back_populates="tenders")
@@ -214,6 +221,7 @@ class CashMovement(Base):
             name="ck_cash_movement_type",
         ),
         Index("ix_cash_movement_recent", "occurred_at"),
+        Index("ix_cash_movement_sale", "sale_id"),
     )
 
     location: Mapped["Location"] = relationship()
@@ -245,3 +253,18 @@ class Alert(Base):
 
     def __repr__(self) -> str:
         return f"<Alert {self.type} product={self.product_id} loc={self.location_id}>"
+
+
+# ---------------------- TENANT SHARD ----------------------
+class TenantShard(Base):
+    """Shard overrides and move freezes; read from the directory shard only."""
+
+    __tablename__ = "tenant_shard"
+
+    tenant_id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    shard: Mapped[str] = mapped_column(Text, nullable=False)
+    frozen: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TenantShard {self.tenant_id} -> {self.shard}>"
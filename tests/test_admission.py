@@ -0,0 +1,110 @@
+import asyncio
+
+from app.core.admission import AdmissionController, AdmissionMiddleware
+
+
+def controller(**kw):
+    args = dict(max_concurrency=4, max_read_concurrency=2, rate=10.0, burst=5,
+                pool_capacity=6, write_reserve=2)
+    args.update(kw)
+    return AdmissionController(**args)
+
+
+def test_reads_capped_below_writes_per_tenant():
+    c = controller()
+    assert c.try_acquire("t1", False) is None
+    assert c.try_acquire("t1", False) is None
+    assert c.try_acquire("t1", False) == 1.0
+    assert c.try_acquire("t1", True) is None
+    assert c.try_acquire("t1", True) is None
+    assert c.try_acquire("t1", True) == 1.0
+    c.release("t1", False)
+    assert c.try_acquire("t1", False) is None
+
+
+def test_token_bucket_returns_retry_after():
+    c = controller(max_concurrency=100, max_read_concurrency=100, pool_capacity=100, burst=2, rate=4.0)
+    for _ in range(2):
+        assert c.try_acquire("t1", True) is None
+        c.release("t1", True)
+    retry = c.try_acquire("t1", True)
+    assert 0 < retry <= 0.25
+
+
+def test_shard_in_flight_cap_leaves_room_for_writes():
+    c = controller()
+    # Four reads fill the shard's read allowance (capacity 6 - reserve 2).
+    for t in ("a", "b"):
+        for _ in range(2):
+            assert c.try_acquire(t, False, "s1") is None
+    assert c.try_acquire("c", False, "s1") == 1.0
+    assert c.try_acquire("c", True, "s1") is None
+    assert c.try_acquire("d", True, "s1") is None
+    # The shard's pool is now full, for writes too.
+    assert c.try_acquire("e", True, "s1") == 1.0
+    # Other shards have their own pools.
+    assert c.try_acquire("e", True, "s2") is None
+    c.release("d", True, "s1")
+    assert c.try_acquire("e", True, "s1") is None
+
+
+def test_idle_tenants_are_evicted_and_capped():
+    c = controller(max_tenants=3)
+    for t in ("a", "b", "c", "d"):
+        assert c.try_acquire(t, True) is None
+        c.release(t, True)
+    assert len(c.snapshot()["tenants"]) <= 3
+
+    # A tenant with a request in flight is kept however many others arrive.
+    c = controller(max_tenants=2, pool_capacity=100)
+    assert c.try_acquire("busy", True) is None
+    for i in range(10):
+        c.try_acquire(f"t{i}", True)
+        c.release(f"t{i}", True)
+    assert "busy" in c.snapshot()["tenants"]
+    c.release("busy", True)
+
+
+def run(middleware, scope, body=b""):
+    seen, sent = {}, []
+
+    async def app(scope, receive, send):
+        seen["body"] = (await receive())["body"]
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    middleware.app = app
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"], seen.get("body")
+
+
+def http_scope(method="GET", query=b"", headers=()):
+    return {"type": "http", "method": method, "path": "/v1/sales", "query_string": query,
+            "headers": list(headers)}
+
+
+def test_middleware_keys_on_handler_tenant_not_header():
+    c = controller(max_concurrency=1, max_read_concurrency=1)
+    mw = AdmissionMiddleware(None, c)
+    c.try_acquire("victim", False)
+    # The header naming another tenant is ignored; the query string decides.
+    status, _ = run(mw, http_scope(query=b"tenant_id=victim", headers=[(b"x-tenant-id", b"other")]))
+    assert status == 429
+    status, _ = run(mw, http_scope(query=b"tenant_id=other", headers=[(b"x-tenant-id", b"victim")]))
+    assert status == 200
+
+
+def test_middleware_reads_json_body_and_replays_it():
+    c = controller()
+    mw = AdmissionMiddleware(None, c, shard_of=lambda t: "s1")
+    body = b'{"tenant_id": "t1", "location_id": "l"}'
+    status, seen = run(mw, http_scope("POST", headers=[(b"content-type", b"application/json")]), body)
+    assert status == 200 and seen == body
+    assert c.snapshot()["tenants"]["t1"]["admitted"] == 1
+    assert c.snapshot()["shards"]["s1"] == {"in_flight": 0, "reads": 0}
@@ -0,0 +1,86 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from app.catalog import SkuPrefixIndex
+
+
+class FakeEngine:
+    def __init__(self, rows, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+        self.loads = 0
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, stmt, params):
+        self.loads += 1
+        time.sleep(self.delay)
+        return list(self.rows[params["t"]])
+
+
+T1 = "6f1c2a9e-3b4d-4e5f-8a7b-1c2d3e4f5a6b"
+T2 = "0a9b8c7d-6e5f-4a3b-9c2d-1e0f9a8b7c6d"
+T3 = "c3d4e5f6-a7b8-4c9d-8e0f-1a2b3c4d5e6f"
+
+ROWS = {
+    T1: [("p1", "ABC-100", "Cola"), ("p2", "abc-200", "Chips"), ("p3", "XYZ-1", "Soap")],
+    T2: [("q1", "ABC-999", "Tea")],
+    T3: [("r1", "R-1", "Rice"), ("r2", "R-2", "Rice 2")],
+}
+
+
+def test_complete_is_case_insensitive_and_tenant_scoped():
+    index = SkuPrefixIndex(lambda t: FakeEngine(ROWS))
+    assert [r["sku"] for r in index.complete(T1, "abc")] == ["ABC-100", "abc-200"]
+    assert [r["id"] for r in index.complete(T1, "ABC-2")] == ["p2"]
+    assert [r["sku"] for r in index.complete(T2, "abc")] == ["ABC-999"]
+    assert index.complete(T1, "abc", limit=1) == [{"id": "p1", "sku": "ABC-100", "name": "Cola"}]
+    assert index.complete(T1, "nope") == []
+
+
+def test_upsert_moves_renamed_sku():
+    index = SkuPrefixIndex(lambda t: FakeEngine(ROWS))
+    index.complete(T1, "a")
+    index.upsert(T1, "p1", "ZZZ-1", "Cola Zero")
+    index.upsert(T1, "p9", "ABC-150", "New")
+    assert [r["sku"] for r in index.complete(T1, "abc")] == ["ABC-150", "abc-200"]
+    assert index.complete(T1, "zzz") == [{"id": "p1", "sku": "ZZZ-1", "name": "Cola Zero"}]
+    # Tenants not loaded yet are read from the DB on first use instead.
+    index.upsert(T2, "q2", "ABC-000", "Ignored")
+    assert [r["sku"] for r in index.complete(T2, "abc")] == ["ABC-999"]
+
+
+def test_concurrent_first_lookups_share_one_load():
+    engine = FakeEngine(ROWS, delay=0.05)
+    index = SkuPrefixIndex(lambda t: engine)
+    threads = [threading.Thread(target=index.complete, args=(T1, "abc")) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert engine.loads == 1
+
+
+def test_evicts_by_tenant_count_and_total_entries():
+    engine = FakeEngine(ROWS)
+    index = SkuPrefixIndex(lambda t: engine, max_tenants=2)
+    for t in (T1, T2, T3):
+        index.complete(t, "a")
+    assert list(index._tenants) == [T2, T3]
+
+    index = SkuPrefixIndex(lambda t: engine, max_entries=4)
+    for t in (T1, T2, T3):
+        index.complete(t, "a")
+    assert list(index._tenants) == [T2, T3]
+
+
+def test_tenant_ids_are_keyed_canonically():
+    index = SkuPrefixIndex(lambda t: FakeEngine(ROWS))
+    assert [r["sku"] for r in index.complete(T1.upper(), "abc")] == ["ABC-100", "abc-200"]
+    index.upsert(uuid.UUID(T1), "p9", "ABC-150", "New")
+    assert [r["sku"] for r in index.complete(T1, "abc-1")] == ["ABC-100", "ABC-150"]
+    assert list(index._tenants) == [T1]
@@ -0,0 +1,57 @@
+import uuid
+
+import orjson
+
+from app.core.events import RESYNC, Subscription, publish_inventory_change
+
+
+def drain(sub):
+    out = []
+    while not sub.queue.empty():
+        out.append(sub.queue.get_nowait())
+    return out
+
+
+def test_offer_filters_on_location():
+    sub = Subscription("t1", "loc-a", maxsize=8)
+    sub.offer({"type": "inventory", "location_id": "loc-a"})
+    sub.offer({"type": "inventory", "location_id": "loc-b"})
+    sub.offer({"type": "resync"})
+    assert drain(sub) == [{"type": "inventory", "location_id": "loc-a"}, {"type": "resync"}]
+
+
+def test_overflow_drops_backlog_and_resyncs():
+    sub = Subscription("t1", None, maxsize=3)
+    for i in range(3):
+        sub.offer({"n": i})
+    sub.offer({"n": 3})
+    assert drain(sub) == [RESYNC]
+
+    # Delivery resumes normally once the client has caught up.
+    sub.offer({"n": 4})
+    assert drain(sub) == [{"n": 4}]
+
+
+def test_close_ends_stream_with_resync():
+    sub = Subscription("t1", None, maxsize=2)
+    sub.offer({"n": 1})
+    sub.offer({"n": 2})
+    sub.close()
+    sub.offer({"n": 3})
+    assert drain(sub) == [RESYNC, None]
+
+
+class RecordingConn:
+    def __init__(self):
+        self.params = []
+
+    def execute(self, stmt, params):
+        self.params.append(params)
+
+
+def test_inventory_events_use_canonical_ids():
+    tenant, location = uuid.uuid4(), uuid.uuid4()
+    conn = RecordingConn()
+    publish_inventory_change(conn, str(tenant).upper(), str(location).upper(), "sale", None, [])
+    event = orjson.loads(conn.params[0]["p"])
+    assert (event["tenant_id"], event["location_id"]) == (str(tenant), str(location))
@@ -0,0 +1,53 @@
+import uuid
+from contextlib import contextmanager
+
+import psycopg2.extensions
+from fastapi.testclient import TestClient
+
+import app.main as main
+
+TENANT, LOCATION, PRODUCT = (str(uuid.uuid4()) for _ in range(3))
+
+
+class Result:
+    def scalar_one(self):
+        return str(uuid.uuid4())
+
+
+class CheckingConn:
+    """Records statements and fails on any bind value psycopg2 cannot adapt."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt, params=None):
+        for value in (params or {}).values():
+            psycopg2.extensions.adapt(value)
+        self.statements.append((str(stmt), params))
+        return Result()
+
+
+class FakeEngine:
+    def __init__(self):
+        self.conn = CheckingConn()
+
+    @contextmanager
+    def begin(self):
+        yield self.conn
+
+
+def test_create_sale_binds_pending_tender_details(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(main.shards, "engine_for", lambda tenant_id, write=False: engine)
+    resp = TestClient(main.app).post("/v1/sales", json={
+        "tenant_id": TENANT,
+        "location_id": LOCATION,
+        "tax_rate": "0",
+        "items": [{"product_id": PRODUCT, "qty": "2", "unit_price": "5.00"}],
+        "tenders": [{"method": "card", "amount": "10.00", "details": {"last4": "4242"}}],
+    })
+    assert resp.status_code == 201, resp.text
+    assert [t["status"] for t in resp.json()["tenders"]] == ["pending"]
+    (params,) = [p for sql, p in engine.conn.statements if "insert into sale_tender" in sql]
+    assert params["st"] == "pending"
+    assert params["det"] == '{"last4":"4242"}'
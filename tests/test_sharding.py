@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+
+from app.core.sharding import ShardMap, ShardRegistry, TenantFrozen
+
+SHARDS = {"a": "sqlite://", "b": "sqlite://", "c": "sqlite://"}
+TENANTS = [str(uuid.UUID(int=i * 7919 + 1)) for i in range(2000)]
+
+
+def test_ring_is_deterministic_and_spreads_tenants():
+    m1, m2 = ShardMap(SHARDS), ShardMap(dict(reversed(SHARDS.items())))
+    assert [m1.shard_for(t) for t in TENANTS] == [m2.shard_for(t) for t in TENANTS]
+    counts = {name: 0 for name in SHARDS}
+    for t in TENANTS:
+        counts[m1.shard_for(t)] += 1
+    assert min(counts.values()) > len(TENANTS) / len(SHARDS) / 2
+
+
+def test_adding_a_shard_only_moves_tenants_onto_it():
+    before = ShardMap(SHARDS)
+    after = ShardMap(dict(SHARDS, d="sqlite://"))
+    moved = [t for t in TENANTS if before.shard_for(t) != after.shard_for(t)]
+    assert all(after.shard_for(t) == "d" for t in moved)
+    assert len(moved) < len(TENANTS) / 2
+
+
+def test_override_precedence_and_case():
+    t = TENANTS[0]
+    hashed = ShardMap(SHARDS).shard_for(t)
+    static = next(n for n in SHARDS if n != hashed)
+    m = ShardMap(SHARDS, overrides={t.upper(): static})
+    assert m.shard_for(t) == static
+    dynamic = next(n for n in SHARDS if n not in (hashed, static))
+    moved = m.load_overrides([(t, dynamic, False)])
+    assert m.shard_for(t.upper()) == dynamic
+    assert moved == {t}
+    # Dropping the directory row falls back to the static override.
+    assert m.load_overrides([]) == {t}
+    assert m.shard_for(t) == static
+
+
+def test_unknown_shards_are_rejected():
+    with pytest.raises(ValueError):
+        ShardMap(SHARDS, overrides={TENANTS[0]: "nope"})
+    m = ShardMap(SHARDS)
+    assert m.load_overrides([(TENANTS[0], "nope", False)]) == set()
+    assert m.shard_for(TENANTS[0]) == m.hashed_shard(TENANTS[0])
+
+
+def test_freeze_blocks_writes_only():
+    t = TENANTS[1]
+    registry = ShardRegistry(ShardMap(SHARDS))
+    home = registry.map.shard_for(t)
+    assert registry.map.load_overrides([(t, home, True)]) == set()
+    assert registry.map.is_frozen(t.upper())
+    assert registry.engine_for(t) is registry.engines[home]
+    with pytest.raises(TenantFrozen):
+        registry.engine_for(t, write=True)
+    registry.map.load_overrides([(t, home, False)])
+    assert registry.engine_for(t, write=True) is registry.engines[home]
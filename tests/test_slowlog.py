@@ -0,0 +1,50 @@
+from app.core.slowlog import SlowQuerySampler, fingerprint
+
+
+def test_fingerprint_groups_literals_and_params():
+    a = fingerprint("SELECT * FROM sale WHERE id = 'x' AND total > 10 -- note\n LIMIT %(n)s")
+    b = fingerprint("select *  from sale where id = 'y''z' and total > 2.5 limit %(m)s")
+    assert a == b == "select * from sale where id = ? and total > ? limit ?"
+
+
+def test_fingerprint_collapses_in_lists_and_keeps_casts():
+    assert fingerprint("select 1 where x in (1, 2, 3)") == "select ? where x in (?)"
+    assert fingerprint("select :p::jsonb") == "select ?::jsonb"
+
+
+class Recorder(SlowQuerySampler):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.jobs = []
+
+    def _submit(self, engine, example, statement, parameters, analyze):
+        self.jobs.append((statement, analyze))
+
+
+def test_only_plain_reads_are_analyzed():
+    s = Recorder(threshold_ms=0)
+    for stmt in ("select * from sale where id = %(id)s",
+                 "select pg_advisory_xact_lock(hashtext(%(t)s))",
+                 "select pg_notify(%(c)s, %(p)s)",
+                 "select id from sale_tender for update skip locked",
+                 "with x as (insert into t values (1) returning id) select * from x",
+                 "update sale set total = 1"):
+        s._record(stmt, {}, 1.0, engine=object())
+    assert [a for _, a in s.jobs] == [True, False, False, False, False, False]
+
+
+def test_keeps_worst_examples_and_caps_fingerprints():
+    s = SlowQuerySampler(threshold_ms=0, examples=2, max_fingerprints=2, explain=False)
+    for ms in (1, 5, 3):
+        s._record("select 1 from a", None, ms / 1000)
+    s._record("select 1 from b", None, 0.001)
+    s._record("select 1 from c", None, 0.001)
+    entries = {e["fingerprint"]: e for e in s.snapshot()}
+    assert set(entries) == {"select ? from b", "select ? from c"}
+
+    s = SlowQuerySampler(threshold_ms=0, examples=2, explain=False)
+    for ms in (1, 5, 3):
+        s._record("select 1 from a", None, ms / 1000)
+    (entry,) = s.snapshot()
+    assert entry["count"] == 3
+    assert [x["ms"] for x in entry["examples"]] == [5.0, 3.0]